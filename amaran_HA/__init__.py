@@ -12,17 +12,53 @@ import voluptuous as vol
 try:
     from homeassistant.core import HomeAssistant
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.helpers import discovery
     from homeassistant.helpers.typing import ConfigType
+    from homeassistant.helpers.storage import Store
+    from homeassistant.helpers.dispatcher import async_dispatcher_send
+    from .coordinator import AmaranCoordinator
     HAS_HOMEASSISTANT = True
 except ImportError:
     HAS_HOMEASSISTANT = False
 
+# 条件导入WebSocket和加密依赖，在模块加载时只导入一次
+try:
+    import websockets
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.backends import default_backend
+    _BACKEND = default_backend()
+    HAS_DEPENDENCIES = True
+except ImportError:
+    HAS_DEPENDENCIES = False
+
+# 优先使用orjson（Home Assistant自带）进行JSON编解码，不可用时回退到标准库
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        # 保持文本帧发送，与服务器现有协议一致
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 # 从本地const.py导入常量
-from .const import DOMAIN, PLATFORMS, CONF_HOST, CONF_PORT, CONF_API_KEY
+from .const import (
+    DOMAIN, PLATFORMS, CONF_HOST, CONF_PORT, CONF_API_KEY, STORAGE_KEY, STORAGE_VERSION,
+    SIGNAL_DEVICES_DISCOVERED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# 连接和请求超时（秒）
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 10
+# 配置流程中检查服务器可达性的超时（秒）
+PING_TIMEOUT = 3
+# 同时等待响应的请求上限，避免启动时数十个请求同时涌向服务器
+MAX_CONCURRENT_REQUESTS = 8
+
 # 简化的配置schema，用于测试环境
 CONFIG_SCHEMA = vol.Schema({
     DOMAIN: vol.Schema({
@@ -32,18 +68,24 @@ CONFIG_SCHEMA = vol.Schema({
     })
 }, extra=vol.ALLOW_EXTRA)
 
-from .const import DOMAIN, PLATFORMS
+# 服务参数schema
+SET_PRESET_SCHEMA = vol.Schema({
+    vol.Required('preset_id'): str,
+    vol.Required('device_id'): str
+})
 
-_LOGGER = logging.getLogger(__name__)
-
-CONFIG_SCHEMA = vol.Schema({
-    DOMAIN: vol.Schema({
-        vol.Required(CONF_HOST): str,
-        vol.Required(CONF_PORT): int,
-        vol.Required(CONF_API_KEY): str,
-    })
+SET_QUICKSHOT_SCHEMA = vol.Schema({
+    vol.Required('quickshot_id'): str,
+    vol.Required('device_id'): str
 }, extra=vol.ALLOW_EXTRA)
 
+def _lower_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """递归地将字典的键转为小写."""
+    return {
+        str(key).lower(): _lower_keys(value) if isinstance(value, dict) else value
+        for key, value in data.items()
+    }
+
 async def async_setup(hass, config) -> bool:
     """Set up the Amaran component."""
     if DOMAIN not in config:
@@ -56,23 +98,84 @@ async def async_setup(hass, config) -> bool:
         'api_key': conf[CONF_API_KEY],
         'websocket': None,
         'devices': {},
+        'devices_by_node': {},
+        'node_ids': {},
         'scenes': {},
         'quickshots': {},
         'presets': {}
     }
 
-    # 仅在HomeAssistant环境中执行发现和注册
-    if HAS_HOMEASSISTANT:
-        # 发现设备并注册平台
-        for platform in PLATFORMS:
-            hass.async_create_task(
-                discovery.async_load_platform(
-                    hass, platform, DOMAIN, {}, config
-                )
-            )
-
+    # 平台由async_setup_entry通过async_forward_entry_setups统一加载
     return True
 
+async def _async_fetch_lists(api) -> Dict[str, Dict[str, Any]]:
+    """并发获取快照、设备和预设列表，避免逐个等待往返."""
+    try:
+        quickshot_list, device_list, preset_list = await asyncio.gather(
+            api.get_quickshot_list(),
+            api.get_device_list(),
+            api.get_preset_list()
+        )
+    except Exception as e:
+        _LOGGER.error("Failed to fetch Amaran lists: %s", e, exc_info=True)
+        return {}
+    return {'quickshots': quickshot_list, 'devices': device_list, 'presets': preset_list}
+
+def _apply_lists(hass, lists: Dict[str, Dict[str, Any]]) -> list:
+    """将设备、快照和预设列表写入hass.data，并返回快照选择项."""
+    data = hass.data[DOMAIN]
+    device_list = lists.get('devices')
+    if device_list and 'data' in device_list:
+        data['device_list'] = device_list['data']
+        # 服务按设备ID直接查找节点ID
+        data['node_ids'] = {d['id']: d['node_id'] for d in device_list['data'] if d.get('id') and d.get('node_id')}
+
+    quickshot_list = lists.get('quickshots')
+    if quickshot_list and 'data' in quickshot_list:
+        available_quickshots = [{'value': str(qs.get('id')), 'label': qs.get('name', f"快照 {qs.get('id')}")} for qs in quickshot_list['data']]
+        data['quickshots'] = {qs['id']: qs['name'] for qs in quickshot_list['data']}
+        # 格式化快照信息为ID:名称，供实体属性共享
+        data['quickshot_info'] = {str(qs_id): name for qs_id, name in data['quickshots'].items()}
+    else:
+        _LOGGER.warning("获取快照列表失败，返回空列表")
+        available_quickshots = []
+
+    preset_list = lists.get('presets')
+    if preset_list and 'data' in preset_list:
+        data['presets'] = preset_list['data']
+        # 格式化预设信息为ID:名称，供实体属性共享
+        data['preset_info'] = {
+            str(preset['id']): preset['name']
+            for preset in data['presets']
+            if isinstance(preset, dict) and preset.get('id') is not None and preset.get('name')
+        }
+
+    return available_quickshots
+
+async def _async_discover(hass, api, store) -> None:
+    """在后台发现设备，通知平台添加实体并写回磁盘缓存."""
+    lists = await _async_fetch_lists(api)
+    device_list = lists.get('devices')
+    _LOGGER.debug("Device list API response: %s", device_list)
+    if not device_list or 'data' not in device_list:
+        _LOGGER.warning("No Amaran devices discovered")
+        return
+    if DOMAIN not in hass.data:
+        return
+
+    available_quickshots = _apply_lists(hass, lists)
+    services = hass.data[DOMAIN].get('services')
+    if services:
+        services['set_quickshot']['quickshot_id']['selector']['select']['options'] = available_quickshots
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        for device in device_list['data']:
+            _LOGGER.debug("Discovered device: %s, details: %s", device.get('id'), device)
+    _LOGGER.info("Discovered %s Amaran devices", len(device_list['data']))
+    async_dispatcher_send(hass, SIGNAL_DEVICES_DISCOVERED, device_list['data'])
+
+    await store.async_save(lists)
+
 async def async_setup_entry(hass, entry) -> bool:
     """Set up Amaran from a config entry."""
     _LOGGER.debug("Starting async_setup_entry for Amaran integration")
@@ -84,6 +187,8 @@ async def async_setup_entry(hass, entry) -> bool:
             'api_key': entry.data[CONF_API_KEY],
             'websocket': None,
             'devices': {},
+            'devices_by_node': {},
+            'node_ids': {},
             'scenes': {},
             'quickshots': {},
             'presets': {}
@@ -109,88 +214,71 @@ async def async_setup_entry(hass, entry) -> bool:
             _LOGGER.error("Failed to connect to Amaran device")
             return False
         _LOGGER.debug("Successfully connected to Amaran device")
+        # 由协调器统一轮询所有灯光状态
+        hass.data[DOMAIN]['coordinator'] = AmaranCoordinator(hass, entry, api)
     except Exception as e:
-        _LOGGER.error(f"Failed to initialize Amaran API: {e}")
+        _LOGGER.error("Failed to initialize Amaran API: %s", e)
         return False
 
+    # 先使用磁盘缓存的列表，实际发现在后台进行，不阻塞平台设置
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+    lists = await store.async_load()
+    if lists:
+        _LOGGER.debug("Using cached Amaran lists")
+        available_quickshots = _apply_lists(hass, lists)
+    else:
+        available_quickshots = []
+
     # 注册设置预设服务
     async def async_set_preset(service):
         """设置预设."""
-        try:
-            preset_id = service.data['preset_id']
-            device_id = service.data['device_id']
-        except KeyError as e:
-            _LOGGER.error(f"缺少必需参数: {e}")
-            return
+        # 参数已由SET_PRESET_SCHEMA校验
+        preset_id = service.data['preset_id']
+        device_id = service.data['device_id']
 
         data = hass.data[DOMAIN]
         # 检查设备是否存在
-        if device_id not in data['devices']:
-            _LOGGER.error(f"设备ID {device_id} 不存在")
+        node_id = data['node_ids'].get(device_id)
+        if node_id is None:
+            _LOGGER.error("设备ID %s 不存在", device_id)
             return
 
-        device = data['devices'][device_id]
-        await data['api'].send_request("set_preset", node_id=device._node_id, args={"preset_id": preset_id})
+        await data['api'].send_request("set_preset", node_id=node_id, args={"preset_id": preset_id})
 
     hass.services.async_register(
         DOMAIN,
         "set_preset",
         async_set_preset,
-        vol.Schema({
-            vol.Required('preset_id'): str,
-            vol.Required('device_id'): str
-        })
+        SET_PRESET_SCHEMA
     )
 
     # 注册设置快照服务
     async def async_set_quickshot(service):
         """设置快照."""
-        try:
-            quickshot_id = service.data['quickshot_id']
-            device_id = service.data['device_id']
-        except KeyError as e:
-            _LOGGER.error(f"缺少必需参数: {e}")
-            return
+        # 参数已由SET_QUICKSHOT_SCHEMA校验
+        quickshot_id = service.data['quickshot_id']
+        device_id = service.data['device_id']
 
         data = hass.data[DOMAIN]
         # 检查设备是否存在
-        if device_id not in data['devices']:
-            _LOGGER.error(f"设备ID {device_id} 不存在")
+        node_id = data['node_ids'].get(device_id)
+        if node_id is None:
+            _LOGGER.error("设备ID %s 不存在", device_id)
             return
 
-        device = data['devices'][device_id]
-        await data['api'].send_request("set_quickshot", node_id=device._node_id, args={"quickshot_id": quickshot_id})
+        # 根据最新发现的快照列表校验快照ID
+        quickshots = data['quickshots']
+        if quickshots and quickshot_id not in {str(qs_id) for qs_id in quickshots}:
+            _LOGGER.error("快照ID %s 不存在", quickshot_id)
+            return
 
-    # 获取可用的快照ID列表
-    async def get_available_quickshots(hass, device_id=None):
-        """获取可用的快照ID列表"""
-        data = hass.data[DOMAIN]
-        try:
-            # 从API获取实际的快照列表
-            quickshot_list = await data['api'].get_quickshot_list()
-            if quickshot_list and 'data' in quickshot_list:
-                return [{'value': str(qs.get('id')), 'label': qs.get('name', f"快照 {qs.get('id')}")} for qs in quickshot_list['data']]
-            else:
-                _LOGGER.warning("获取快照列表失败，返回空列表")
-                return []
-        except Exception as e:
-            _LOGGER.error(f"获取快照列表时发生错误: {e}")
-            # 发生错误时返回空列表
-            return []
+        await data['api'].send_request("set_quickshot", node_id=node_id, args={"quickshot_id": quickshot_id})
 
     hass.services.async_register(
         DOMAIN,
         "set_quickshot",
         async_set_quickshot,
-        vol.Schema({
-            vol.Required('quickshot_id'): vol.All(
-                str,
-                vol.In([item['value'] for item in await get_available_quickshots(hass)])
-            ),
-            vol.Required('device_id'): str
-        },
-        extra=vol.ALLOW_EXTRA
-        )
+        SET_QUICKSHOT_SCHEMA
     )
 
     # 为服务添加描述，以便UI可以显示选择界面
@@ -201,7 +289,7 @@ async def async_setup_entry(hass, entry) -> bool:
                 'description': '选择要应用的快照',
                 'selector': {
                     'select': {
-                        'options': await get_available_quickshots(hass)
+                        'options': available_quickshots
                     }
                 }
             },
@@ -212,22 +300,10 @@ async def async_setup_entry(hass, entry) -> bool:
         }
     }
 
-    # 发现设备
-    try:
-        device_list = await api.get_device_list()
-        _LOGGER.debug(f"Device list API response: {device_list}")
-        if device_list and 'data' in device_list:
-            hass.data[DOMAIN]['devices'] = {}
-            for device in device_list['data']:
-                device_id = device.get('device_id')
-                if device_id:
-                    hass.data[DOMAIN]['devices'][device_id] = device
-                    _LOGGER.debug(f"Discovered device: {device_id}, details: {device}")
-            _LOGGER.info(f"Discovered {len(hass.data[DOMAIN]['devices'])} Amaran devices")
-        else:
-            _LOGGER.warning("No Amaran devices discovered")
-    except Exception as e:
-        _LOGGER.error(f"Failed to discover devices: {e}", exc_info=True)
+    # 在后台发现设备，平台通过SIGNAL_DEVICES_DISCOVERED信号添加实体；卸载条目时取消
+    entry.async_create_background_task(
+        hass, _async_discover(hass, api, store), "amaran_discover", eager_start=True
+    )
 
     # 转发配置到平台
     _LOGGER.debug("Forwarding config entry setups to platforms")
@@ -236,21 +312,21 @@ async def async_setup_entry(hass, entry) -> bool:
         _LOGGER.info("Amaran integration setup completed successfully")
         return True
     except Exception as e:
-        _LOGGER.error(f"Failed to forward entry setups: {e}")
+        _LOGGER.error("Failed to forward entry setups: %s", e)
         return False
 
 async def async_unload_entry(hass, entry) -> bool:
     """Unload a config entry."""
     # 仅在HomeAssistant环境中执行卸载
     if HAS_HOMEASSISTANT:
-        unload_ok = all(
-            await asyncio.gather(
-                *[hass.config_entries.async_forward_entry_unload(entry, platform) for platform in PLATFORMS]
-            )
-        )
+        unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
         if unload_ok:
-            hass.data.pop(DOMAIN)
+            # 关闭WebSocket连接
+            api = hass.data.get(DOMAIN, {}).get('api')
+            if api:
+                await api.close()
+            hass.data.pop(DOMAIN, None)
 
         return unload_ok
     return True
@@ -266,67 +342,168 @@ class AmaranAPI:
         self.websocket = None
         self.client_id = 1
         self.request_id = 1
+        # 每个请求中固定不变的字段
+        self._base_request = {"version": 2, "type": "request", "client_id": self.client_id}
+        # 仅保护发送，响应由后台读取任务按request_id分发
         self._ws_lock = asyncio.Lock()
-        self._last_request_time = 0
-        self._min_request_interval = 0.2  # 200ms
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        # 正在关闭的被丢弃连接，保留引用以免任务被回收
+        self._close_tasks: set = set()
+        # 进行中的重连，并发请求共享同一次握手及其结果（包括失败）
+        self._connect_task: Optional[asyncio.Task] = None
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._key_bytes: Optional[bytes] = None
+        # 同一秒内的明文相同，缓存 (时间戳, token) 以复用
+        self._token_cache: Optional[tuple] = None
 
     async def connect(self) -> bool:
         """Connect to the Amaran WebSocket server."""
-        try:
-            import websockets
-            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-            from cryptography.hazmat.backends import default_backend
+        if not HAS_DEPENDENCIES:
+            _LOGGER.error("Missing required packages: websockets and cryptography")
+            return False
 
+        try:
             uri = f"ws://{self.host}:{self.port}"
-            self.websocket = await websockets.connect(uri)
+            async with asyncio.timeout(CONNECT_TIMEOUT):
+                # 启用心跳以便在没有请求时也能发现断开的连接
+                self.websocket = await websockets.connect(uri, ping_interval=20, ping_timeout=10)
+            self._reader_task = asyncio.create_task(self._read_loop(self.websocket))
             _LOGGER.info("Connected to Amaran WebSocket server")
             return True
         except Exception as e:
-            _LOGGER.error(f"Failed to connect to Amaran WebSocket server: {e}")
+            _LOGGER.error("Failed to connect to Amaran WebSocket server: %s", e)
+            return False
+
+    async def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """Check that the Amaran server accepts connections."""
+        try:
+            async with asyncio.timeout(timeout):
+                # 只建立TCP连接，不进行WebSocket握手，也不启动读取任务
+                _, writer = await asyncio.open_connection(self.host, self.port)
+        except (OSError, TimeoutError, ValueError, OverflowError) as e:
+            _LOGGER.debug("Amaran server %s:%s is not reachable: %s", self.host, self.port, e)
             return False
 
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _read_loop(self, websocket) -> None:
+        """Dispatch incoming responses to the pending requests."""
+        try:
+            while True:
+                message = await websocket.recv()
+                try:
+                    response = _json_loads(message)
+                except ValueError:
+                    _LOGGER.warning("Received invalid message: %s", message)
+                    continue
+                if not isinstance(response, dict):
+                    continue
+                future = self._pending.pop(response.get('request_id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.error("Amaran WebSocket connection lost: %s", e)
+        finally:
+            if self.websocket is websocket:
+                self.websocket = None
+                self._fail_pending()
+
+    async def _async_reconnect(self) -> bool:
+        """Reconnect, sharing one attempt between concurrent callers."""
+        task = self._connect_task
+        if task is None:
+            task = self._connect_task = asyncio.create_task(self.connect())
+            task.add_done_callback(self._clear_connect_task)
+        # 单个调用方被取消时不影响其他等待同一次连接的调用方
+        return await asyncio.shield(task)
+
+    def _clear_connect_task(self, task: asyncio.Task) -> None:
+        """Forget a finished connect attempt so the next request retries."""
+        if self._connect_task is task:
+            self._connect_task = None
+
+    def _drop_connection(self, websocket) -> None:
+        """Abandon the given connection and fail its pending requests."""
+        if self.websocket is not websocket:
+            return
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self.websocket = None
+        self._fail_pending()
+        # 关闭被丢弃的连接，否则心跳会让它一直保持打开
+        task = asyncio.create_task(self._close_socket(websocket))
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    @staticmethod
+    async def _close_socket(websocket) -> None:
+        """Close a WebSocket connection, logging any error."""
+        try:
+            await websocket.close()
+        except Exception as e:
+            _LOGGER.warning("Error while closing Amaran WebSocket connection: %s", e)
+
+    def _fail_pending(self) -> None:
+        """Fail all requests still waiting for a response."""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Amaran WebSocket connection closed"))
+
     def generate_token(self) -> str:
         """Generate token using AES-256-GCM."""
+        now = int(time.time())
+        if self._token_cache and self._token_cache[0] == now:
+            return self._token_cache[1]
+
         try:
-            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-            from cryptography.hazmat.backends import default_backend
+            if self._key_bytes is None:
+                self._key_bytes = base64.b64decode(self.api_key)
 
             iv = os.urandom(12)
             encryptor = Cipher(
-                algorithms.AES(base64.b64decode(self.api_key)),
+                algorithms.AES(self._key_bytes),
                 modes.GCM(iv),
-                backend=default_backend()
+                backend=_BACKEND
             ).encryptor()
-            now = int(time.time())
             ciphertext = encryptor.update(str(now).encode()) + encryptor.finalize()
             combined = iv + encryptor.tag + ciphertext
-            return base64.b64encode(combined).decode()
+            token = base64.b64encode(combined).decode()
+            self._token_cache = (now, token)
+            return token
         except Exception as e:
-            _LOGGER.error(f"Failed to generate token: {e}")
+            _LOGGER.error("Failed to generate token: %s", e)
             return ""
 
     async def send_request(self, action: str, node_id: Optional[str] = None, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Send request to Amaran WebSocket server."""
-        # 检查请求间隔
-        current_time = time.time()
-        elapsed = current_time - self._last_request_time
-        if elapsed < self._min_request_interval:
-            await asyncio.sleep(self._min_request_interval - elapsed)
-        self._last_request_time = time.time()
+        if self.websocket is None and not await self._async_reconnect():
+            return {}
 
-        if not self.websocket:
-            if not await self.connect():
-                return {}
+        async with self._request_slots:
+            return await self._send_request(action, node_id, args)
 
+    async def _send_request(self, action: str, node_id: Optional[str], args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send one request and wait for its response."""
         token = self.generate_token()
         if not token:
             return {}
 
+        request_id = self.request_id
+        self.request_id += 1
+
         request = {
-            "version": 2,
-            "type": "request",
-            "client_id": self.client_id,
-            "request_id": self.request_id,
+            **self._base_request,
+            "request_id": request_id,
             "action": action,
             "token": token
         }
@@ -337,16 +514,31 @@ class AmaranAPI:
         if args:
             request["args"] = args
 
+        websocket = self.websocket
+        if websocket is None:
+            # 排队期间连接已断开
+            return {}
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
         try:
-            async with self._ws_lock:
-                await self.websocket.send(json.dumps(request))
-                self.request_id += 1
-                response = await self.websocket.recv()
-                return json.loads(response)
+            async with asyncio.timeout(REQUEST_TIMEOUT):
+                async with self._ws_lock:
+                    await websocket.send(_json_dumps(request))
+                response = await future
+            # 统一在此将返回数据的键转为小写，调用方无需再处理大小写
+            if isinstance(response.get('data'), dict):
+                response['data'] = _lower_keys(response['data'])
+            return response
+        except TimeoutError:
+            # 只放弃本次请求，连接是否存活由心跳检测，不影响其他进行中的请求
+            _LOGGER.error("Request %s timed out after %ss", action, REQUEST_TIMEOUT)
+            return {}
         except Exception as e:
-            _LOGGER.error(f"Failed to send request: {e}")
-            self.websocket = None
+            _LOGGER.error("Failed to send request: %s", e)
+            self._drop_connection(websocket)
             return {}
+        finally:
+            self._pending.pop(request_id, None)
 
     async def get_device_list(self) -> Dict[str, Any]:
         """Get list of devices."""
@@ -356,6 +548,10 @@ class AmaranAPI:
         """Get node configuration."""
         return await self.send_request("get_node_config", node_id=node_id)
 
+    async def get_node_state(self, node_id: str) -> Dict[str, Any]:
+        """Get intensity, cct, hsi and rgb of a node in one request."""
+        return await self.send_request("get_node_state", node_id=node_id)
+
     async def get_quickshot_list(self) -> Dict[str, Any]:
         """Get list of quickshots."""
         return await self.send_request("get_quickshot_list")
@@ -366,6 +562,11 @@ class AmaranAPI:
 
     async def close(self) -> None:
         """Close the WebSocket connection."""
-        if self.websocket:
-            await self.websocket.close()
-            self.websocket = None
\ No newline at end of file
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        # 先清除连接引用，确保关闭出错时也能完成清理
+        websocket, self.websocket = self.websocket, None
+        if websocket:
+            await self._close_socket(websocket)
+        self._fail_pending()
\ No newline at end of file
@@ -19,7 +19,7 @@ _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_HOST): str,
-    vol.Required(CONF_PORT, default=12345): int,
+    vol.Required(CONF_PORT, default=12345): vol.All(int, vol.Range(min=1, max=65535)),
     vol.Required(CONF_API_KEY): str,
 })
 
@@ -39,9 +39,8 @@ if HAS_HOMEASSISTANT:
             if user_input is not None:
                 # 验证连接
                 api = AmaranAPI(self.hass, user_input[CONF_HOST], user_input[CONF_PORT], user_input[CONF_API_KEY])
-                connected = await api.connect()
+                connected = await api.ping()
                 if connected:
-                    await api.close()
                     return self.async_create_entry(title="Amaran Lights", data=user_input)
                 else:
                     errors["base"] = "cannot_connect"
@@ -4,4 +4,11 @@ PLATFORMS = ["light"]
 # 配置常量
 CONF_HOST = "host"
 CONF_PORT = "port"
-CONF_API_KEY = "api_key"
\ No newline at end of file
+CONF_API_KEY = "api_key"
+
+# 发现数据磁盘缓存
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}_discovery"
+
+# 设备发现完成后发送的信号
+SIGNAL_DEVICES_DISCOVERED = f"{DOMAIN}_devices_discovered"
\ No newline at end of file
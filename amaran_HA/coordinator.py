@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# 状态轮询间隔
+SCAN_INTERVAL = timedelta(seconds=30)
+
+class AmaranCoordinator(DataUpdateCoordinator):
+    """Poll the state of all Amaran nodes in a single refresh."""
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, api):
+        super().__init__(
+            hass, _LOGGER, config_entry=entry, name=DOMAIN, update_interval=SCAN_INTERVAL
+        )
+        self.api = api
+        # node_id -> 需要查询的状态字段，例如 ('intensity', 'cct')
+        self._nodes: Dict[str, Tuple[str, ...]] = {}
+        # 服务器是否支持get_node_state批量查询，确认不支持后改为逐项查询
+        self._node_state_supported = True
+        # 最近一次刷新开始的时间（monotonic），实体据此判断结果是否早于本地命令
+        self.refresh_started = 0.0
+
+    @callback
+    def async_add_node(self, node_id: str, fields: Tuple[str, ...]) -> None:
+        """Register a node whose state should be polled."""
+        self._nodes[node_id] = fields
+
+    @callback
+    def async_remove_node(self, node_id: str) -> None:
+        """Stop polling a node."""
+        self._nodes.pop(node_id, None)
+
+    async def _async_fetch_node(self, node_id: str, fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """Fetch the requested state fields of one node."""
+        if not self._node_state_supported:
+            return await self._async_fetch_fields(node_id, fields)
+
+        response = await self.api.get_node_state(node_id)
+        if response and isinstance(response.get('data'), dict):
+            state = response['data']
+            return {field: state[field] for field in fields if field in state}
+
+        # 批量查询失败时在本次刷新中改用逐项查询
+        state = await self._async_fetch_fields(node_id, fields)
+        if state and self._node_state_supported:
+            # 逐项查询成功而批量查询失败，说明服务器不支持get_node_state
+            _LOGGER.debug(
+                "get_node_state failed for node %s (%s) while per-field requests succeeded, "
+                "using per-field requests from now on", node_id, response
+            )
+            self._node_state_supported = False
+        return state
+
+    async def _async_fetch_fields(self, node_id: str, fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """Fetch the state fields of one node with one get_<field> request each."""
+        responses = await asyncio.gather(
+            *[self.api.send_request(f"get_{field}", node_id=node_id) for field in fields]
+        )
+        return {
+            field: response['data']
+            for field, response in zip(fields, responses)
+            if response and 'data' in response
+        }
+
+    async def _async_update_data(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch the state of every registered node."""
+        self.refresh_started = time.monotonic()
+        nodes = dict(self._nodes)
+        if not nodes:
+            return {}
+
+        states = await asyncio.gather(
+            *[self._async_fetch_node(node_id, fields) for node_id, fields in nodes.items()]
+        )
+        data = dict(zip(nodes, states))
+        if not any(data.values()):
+            raise UpdateFailed("Failed to fetch state of any Amaran node")
+        return data
@@ -14,9 +14,15 @@ async def main():
     await api.connect()
 
     try:
+        # 并发获取设备、快照和预设列表
+        device_list, quickshot_list, preset_list = await asyncio.gather(
+            api.get_device_list(),
+            api.get_quickshot_list(),
+            api.get_preset_list()
+        )
+
         # 获取设备列表
         print("===== 设备列表 =====")
-        device_list = await api.get_device_list()
         if device_list and 'data' in device_list:
             for device in device_list['data']:
                 if device['id'] != '00000000000000000000000000000000':  # 跳过群组
@@ -26,7 +32,6 @@ async def main():
 
         # 获取快照列表
         print("\n===== 快照列表 =====")
-        quickshot_list = await api.get_quickshot_list()
         if quickshot_list and 'data' in quickshot_list:
             for quickshot in quickshot_list['data']:
                 print(f"快照名称: {quickshot['name']}")
@@ -34,7 +39,6 @@ async def main():
 
         # 获取预设列表
         print("\n===== 预设列表 =====")
-        preset_list = await api.get_preset_list()
         if preset_list and 'data' in preset_list:
             for preset_type in preset_list['data']:
                 print(f"预设类型: {preset_type['type']}")
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any
 
 from homeassistant.components.light import (
@@ -11,18 +12,45 @@ from homeassistant.components.light import (
     LightEntity
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util.color import (
-    color_temperature_kelvin_to_mired,
-    color_temperature_mired_to_kelvin
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import DOMAIN, SIGNAL_DEVICES_DISCOVERED
 from . import AmaranAPI
+from .coordinator import AmaranCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# 非灯光设备的ID（群组等）
+_NON_DEVICE_IDS = frozenset({'0' * 32})
+
+# 亮度(0-255)与设备强度(0-1000)的换算表
+_B2I = tuple(round(i * 1000 / 255) for i in range(256))
+_I2B = tuple(round(i * 255 / 1000) for i in range(1001))
+
+# 颜色模式优先级: COLOR_TEMP > HS > RGB
+_COLOR_MODE_PRIORITY = (ColorMode.COLOR_TEMP, ColorMode.HS, ColorMode.RGB)
+_PRIMARY_COLOR_MODES = frozenset(_COLOR_MODE_PRIORITY)
+
+# 各状态字段在字典格式响应中的键
+_INTENSITY_KEYS = ('intensity',)
+_CCT_KEYS = ('cct',)
+_HSI_KEYS = ('hue', 'sat')
+_RGB_KEYS = ('r', 'g', 'b')
+_POWER_KEYS = ('on',)
+
+def _extract(data: Any, keys: tuple) -> Optional[tuple]:
+    """按键取出状态数值，单字段也接受直接返回的数值，格式不符时返回None."""
+    if isinstance(data, dict):
+        if all(isinstance(data.get(key), (int, float)) for key in keys):
+            return tuple(data[key] for key in keys)
+        return None
+    if len(keys) == 1 and isinstance(data, (int, float)):
+        return (data,)
+    return None
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -30,69 +58,91 @@ async def async_setup_entry(
 ) -> None:
     """Set up Amaran light entities from a config entry."""
     data = hass.data[DOMAIN]
-    api = AmaranAPI(hass, data['host'], data['port'], data['api_key'])
-
-    # 获取设备列表
-    device_list = await api.get_device_list()
-    if not device_list or 'data' not in device_list:
-        _LOGGER.error("Failed to get device list")
-        return
-
-    # 获取快照和预设列表
-    quickshot_list = await api.get_quickshot_list()
-    if quickshot_list and 'data' in quickshot_list:
-        data['quickshots'] = {item['id']: item['name'] for item in quickshot_list['data']}
-
-    preset_list = await api.get_preset_list()
-    if preset_list and 'data' in preset_list:
-        data['presets'] = preset_list['data']
-
-    # 创建灯光实体
-    lights = []
-    for device in device_list['data']:
-        # 跳过群组
-        if device['id'] == '00000000000000000000000000000000':
-            continue
-
-        # 获取设备配置
-        node_config = await api.get_node_config(device['node_id'])
-        if not node_config or 'data' not in node_config:
-            _LOGGER.error(f"Failed to get node config for {device['name']}")
-            continue
-
-        config = node_config['data']
-        # 初始化支持的颜色模式集合
-        color_modes = {ColorMode.ONOFF, ColorMode.BRIGHTNESS}
-
-        # 检查支持的功能
-        if config.get('cct_support', False):
-            color_modes.add(ColorMode.COLOR_TEMP)
-
-        if config.get('rgb_support', False) or config.get('hsi_support', False):
-            color_modes.add(ColorMode.HS)
-            color_modes.add(ColorMode.RGB)
-
-        # 保留为set以便后续处理
-        color_modes = set(color_modes)
-
-        # 创建灯光实体
-        light = AmaranLight(
-            api, 
-            device['id'], 
-            device['name'], 
-            device['node_id'], 
-            color_modes, 
-            config
+    # 与集成共享同一个API实例和WebSocket连接
+    api = data['api']
+    coordinator = data['coordinator']
+
+    # 已处理的设备ID，避免缓存与后台发现重复创建实体
+    known_ids = set()
+
+    async def async_add_devices(devices) -> None:
+        """为尚未添加的设备创建灯光实体."""
+        new_devices = []
+        for device in devices:
+            # 跳过群组
+            if device['id'] in _NON_DEVICE_IDS:
+                continue
+            if device['id'] in known_ids:
+                continue
+            known_ids.add(device['id'])
+            new_devices.append(device)
+
+        # 并发获取设备配置
+        node_configs = await asyncio.gather(
+            *[api.get_node_config(device['node_id']) for device in new_devices],
+            return_exceptions=True
         )
-        lights.append(light)
-        data['devices'][device['id']] = light
 
-    async_add_entities(lights, update_before_add=True)
+        lights = []
+        for device, node_config in zip(new_devices, node_configs):
+            if isinstance(node_config, Exception) or not node_config or 'data' not in node_config:
+                _LOGGER.error("Failed to get node config for %s", device['name'])
+                known_ids.discard(device['id'])
+                continue
+
+            config = node_config['data']
+            # 初始化支持的颜色模式集合
+            color_modes = {ColorMode.ONOFF, ColorMode.BRIGHTNESS}
+
+            # 检查支持的功能
+            if config.get('cct_support', False):
+                color_modes.add(ColorMode.COLOR_TEMP)
+
+            if config.get('rgb_support', False) or config.get('hsi_support', False):
+                color_modes.add(ColorMode.HS)
+                color_modes.add(ColorMode.RGB)
+
+            # 创建灯光实体
+            light = AmaranLight(
+                coordinator,
+                api, 
+                device['id'], 
+                device['name'], 
+                device['node_id'], 
+                color_modes, 
+                config
+            )
+            lights.append(light)
+            data['devices'][device['id']] = light
+            # 按node_id索引，便于按节点分发状态更新
+            data['devices_by_node'][device['node_id']] = light
+
+        if lights:
+            # 由协调器一次性获取所有新设备的状态，无需逐个实体更新
+            await coordinator.async_refresh()
+            async_add_entities(lights, update_before_add=False)
+
+    @callback
+    def async_schedule_add_devices(devices) -> None:
+        """在后台添加设备，获取配置和状态不阻塞条目设置，卸载条目时随之取消."""
+        entry.async_create_background_task(
+            hass, async_add_devices(devices), "amaran_add_devices", eager_start=True
+        )
+
+    # 后台发现完成后添加新设备
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_DISCOVERED, async_schedule_add_devices)
+    )
+
+    # 使用已有的设备列表（磁盘缓存或已完成的发现）创建实体
+    if data.get('device_list'):
+        async_schedule_add_devices(data['device_list'])
 
-class AmaranLight(LightEntity):
+class AmaranLight(CoordinatorEntity, LightEntity):
     """Representation of an Amaran light."""
     def __init__(
         self, 
+        coordinator: AmaranCoordinator,
         api: AmaranAPI, 
         device_id: str, 
         name: str, 
@@ -100,62 +150,54 @@ class AmaranLight(LightEntity):
         color_modes: set[ColorMode], 
         config: Dict[str, Any]
     ):
+        super().__init__(coordinator)
         self._api = api
         self._device_id = device_id
         self._name = name
         self._node_id = node_id
         # 修复颜色模式设置，确保只包含有效的非互斥模式
         # 移除ONOFF因为BRIGHTNESS已包含此功能
-        self._color_modes = set(color_modes)
-        if ColorMode.ONOFF in self._color_modes:
-            self._color_modes.remove(ColorMode.ONOFF)
-        
-        # 确保BRIGHTNESS不与其他颜色模式共存
-        if (ColorMode.COLOR_TEMP in self._color_modes or 
-            ColorMode.HS in self._color_modes or 
-            ColorMode.RGB in self._color_modes):
-            if ColorMode.BRIGHTNESS in self._color_modes:
-                self._color_modes.remove(ColorMode.BRIGHTNESS)
-        
-        # 定义主要颜色模式
-        primary_modes = []
-        if ColorMode.COLOR_TEMP in self._color_modes:
-            primary_modes.append(ColorMode.COLOR_TEMP)
-        if ColorMode.HS in self._color_modes:
-            primary_modes.append(ColorMode.HS)
-        if ColorMode.RGB in self._color_modes:
-            primary_modes.append(ColorMode.RGB)
-        
-        # 移除互斥的颜色模式组合
-        # 确保COLOR_TEMP、HS和RGB不会同时存在
-        if len(primary_modes) > 1:
-            # 优先级: COLOR_TEMP > HS > RGB
-            self._color_modes = set(self._color_modes)
-            for mode in primary_modes:
-                if mode != ColorMode.COLOR_TEMP and ColorMode.COLOR_TEMP in primary_modes:
-                    self._color_modes.remove(mode)
-                elif mode != ColorMode.HS and ColorMode.HS in primary_modes and ColorMode.COLOR_TEMP not in primary_modes:
-                    self._color_modes.remove(mode)
-        
+        modes = set(color_modes) - {ColorMode.ONOFF}
+        primary = modes & _PRIMARY_COLOR_MODES
+        if primary:
+            # BRIGHTNESS不与其他颜色模式共存，且只保留优先级最高的模式: COLOR_TEMP > HS > RGB
+            pick = next(mode for mode in _COLOR_MODE_PRIORITY if mode in primary)
+            modes -= (primary - {pick}) | {ColorMode.BRIGHTNESS}
+        self._color_modes = modes
         self._attr_supported_color_modes = self._color_modes
-        
+
         # 确定默认颜色模式
-        if ColorMode.COLOR_TEMP in self._color_modes:
-            self._color_mode = ColorMode.COLOR_TEMP
-        elif ColorMode.HS in self._color_modes:
-            self._color_mode = ColorMode.HS
-        elif ColorMode.RGB in self._color_modes:
-            self._color_mode = ColorMode.RGB
-        else:
-            self._color_mode = ColorMode.BRIGHTNESS
+        self._color_mode = pick if primary else ColorMode.BRIGHTNESS
         self._config = config
         self._is_on = False
         self._brightness = 255
+        # 最近一次轮询到的强度是否为0，_brightness此时保留的是之前的亮度
+        self._zero_intensity = False
         self._color_temp = None
         self._hs_color = None
         self._rgb_color = None
+        # 最近一次成功命令的发送时间，早于它开始的轮询结果已过期，不应覆盖新状态
+        self._command_sent = 0.0
+        self._domain_data: Dict[str, Any] = {}
         self._cct_min = config.get('cct_min', 2000)
         self._cct_max = config.get('cct_max', 10000)
+        # 色温范围不会变化，预先计算
+        self._attr_min_color_temp_kelvin = self._cct_min
+        self._attr_max_color_temp_kelvin = self._cct_max
+        # 设备支持set_power时用电源开关代替把强度设为0
+        self._power_support = config.get('power_support', False)
+
+        # 向协调器注册需要轮询的状态字段
+        fields = ['intensity']
+        if self._power_support:
+            fields.append('power')
+        if ColorMode.COLOR_TEMP in self._color_modes:
+            fields.append('cct')
+        if ColorMode.HS in self._color_modes:
+            fields.append('hsi')
+        if ColorMode.RGB in self._color_modes:
+            fields.append('rgb')
+        coordinator.async_add_node(node_id, tuple(fields))
 
     @property
     def name(self) -> str:
@@ -177,38 +219,11 @@ class AmaranLight(LightEntity):
         """Return the brightness of the light."""
         return self._brightness
 
-    @property
-    def color_temp(self) -> int:
-        """Return the color temperature of the light in mireds."""
-        if self._color_temp is not None and self._color_temp > 0:
-            return color_temperature_kelvin_to_mired(self._color_temp)
-        return None
-
     @property
     def color_temp_kelvin(self) -> int:
         """Return the color temperature of the light in kelvin."""
         return self._color_temp if self._color_temp is not None and self._color_temp > 0 else None
 
-    @property
-    def min_color_temp_kelvin(self) -> int:
-        """Return the minimum color temperature in kelvin."""
-        return self._cct_min
-
-    @property
-    def max_color_temp_kelvin(self) -> int:
-        """Return the maximum color temperature in kelvin."""
-        return self._cct_max
-
-    @property
-    def min_mireds(self) -> int:
-        """Return the minimum color temperature in mireds."""
-        return color_temperature_kelvin_to_mired(self._cct_max)
-
-    @property
-    def max_mireds(self) -> int:
-        """Return the maximum color temperature in mireds."""
-        return color_temperature_kelvin_to_mired(self._cct_min)
-
     @property
     def hs_color(self) -> tuple:
         """Return the HS color value."""
@@ -227,52 +242,35 @@ class AmaranLight(LightEntity):
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return extra state attributes."""
-        # 获取全局快照和预设列表
-        hass = self.hass
-        domain_data = hass.data.get(DOMAIN, {})
-        quickshots = domain_data.get('quickshots', {})
-        presets = domain_data.get('presets', [])
-        
-        # 格式化快照信息为ID:名称
-        quickshot_info = {str(id): name for id, name in quickshots.items()}
-        
-        # 格式化预设信息为ID:名称
-        preset_info = {}
-        for preset in presets:
-            if isinstance(preset, dict):
-                preset_id = str(preset.get('id'))
-                preset_name = preset.get('name')
-                if preset_id and preset_name:
-                    preset_info[preset_id] = preset_name
-        
+        # 快照和预设的ID:名称信息在获取列表时已格式化，所有实体共享
+        domain_data = self._domain_data
         return {
             'device_id': self._device_id,
             'node_id': self._node_id,
             'cct_min': self._cct_min,
             'cct_max': self._cct_max,
-            'quickshot_ids': quickshot_info,
-            'preset_ids': preset_info
+            'quickshot_ids': domain_data.get('quickshot_info', {}),
+            'preset_ids': domain_data.get('preset_info', {})
         }
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the light."""
-        _LOGGER.debug(f"Turning on device {self._name} with kwargs: {kwargs}")
+        _LOGGER.debug("Turning on device %s with kwargs: %s", self._name, kwargs)
         # 定义颜色模式优先级: COLOR_TEMP > HS > RGB
         # 初始化颜色模式变量
         new_color_mode = None
-        intensity = int(self._brightness * 1000 / 255) if self._brightness else 1000
-        _LOGGER.debug(f"Initial intensity: {intensity}, current brightness: {self._brightness}")
+        intensity = _B2I[self._brightness] if self._brightness else 1000
+        _LOGGER.debug("Initial intensity: %s, current brightness: %s", intensity, self._brightness)
+
+        # 收集需要发送的命令，最后合并发送
+        commands = []
 
         # 亮度
         if ATTR_BRIGHTNESS in kwargs:
             brightness = kwargs[ATTR_BRIGHTNESS]
             # 转换为 0-1000 范围
-            intensity = int(brightness * 1000 / 255)
-            await self._api.send_request(
-                "set_intensity", 
-                node_id=self._node_id, 
-                args={"intensity": intensity}
-            )
+            intensity = _B2I[brightness]
+            commands.append(("set_intensity", {"intensity": intensity}))
             self._brightness = brightness
 
         # 色温 (最高优先级)
@@ -280,11 +278,7 @@ class AmaranLight(LightEntity):
             kelvin = kwargs[ATTR_COLOR_TEMP_KELVIN]
             # 确保在设备支持的范围内
             kelvin = max(self._cct_min, min(self._cct_max, kelvin))
-            await self._api.send_request(
-                "set_cct", 
-                node_id=self._node_id, 
-                args={"cct": kelvin}
-            )
+            commands.append(("set_cct", {"cct": kelvin}))
             self._color_temp = kelvin
             new_color_mode = ColorMode.COLOR_TEMP
             # 清除其他颜色模式
@@ -298,15 +292,11 @@ class AmaranLight(LightEntity):
             # 转换为整数
             hue = int(hue)
             sat = int(sat)
-            await self._api.send_request(
-                "set_hsi", 
-                node_id=self._node_id, 
-                args={
-                    "hue": hue, 
-                    "sat": sat, 
-                    "intensity": intensity
-                }
-            )
+            commands.append(("set_hsi", {
+                "hue": hue, 
+                "sat": sat, 
+                "intensity": intensity
+            }))
             self._hs_color = hs_color
             new_color_mode = ColorMode.HS
             # 清除其他颜色模式
@@ -317,16 +307,12 @@ class AmaranLight(LightEntity):
         if ATTR_RGB_COLOR in kwargs and new_color_mode is None:
             rgb_color = kwargs[ATTR_RGB_COLOR]
             r, g, b = rgb_color
-            await self._api.send_request(
-                "set_rgb", 
-                node_id=self._node_id, 
-                args={
-                    "r": r, 
-                    "g": g, 
-                    "b": b, 
-                    "intensity": intensity
-                }
-            )
+            commands.append(("set_rgb", {
+                "r": r, 
+                "g": g, 
+                "b": b, 
+                "intensity": intensity
+            }))
             self._rgb_color = rgb_color
             new_color_mode = ColorMode.RGB
             # 清除其他颜色模式
@@ -335,54 +321,122 @@ class AmaranLight(LightEntity):
 
         # 如果没有指定任何参数，只打开灯
         if not kwargs:
+            # 灯已以非零亮度打开，无需重复发送请求
+            if self._is_on and self._brightness:
+                self.async_write_ha_state()
+                return
             # 确保亮度不为 0
-            if self._brightness == 0 or self._brightness is None:
+            if not self._brightness:
                 self._brightness = 255
                 intensity = 1000
-                await self._api.send_request(
-                    "set_intensity", 
-                    node_id=self._node_id, 
-                    args={"intensity": intensity}
-                )
-            else:
-                await self._api.send_request(
-                    "set_intensity", 
-                    node_id=self._node_id, 
-                    args={"intensity": intensity}
-                )
+            # 电源已开但强度为0时，只打开电源不会点亮
+            if not self._power_support or self._zero_intensity:
+                commands.append(("set_intensity", {"intensity": intensity}))
+
+        # 电源关闭时单独设置强度或颜色不会点亮，需要先打开电源
+        if self._power_support and not self._is_on:
+            commands.insert(0, ("set_power", {"on": True}))
+
+        sent = time.monotonic()
+        if await self._async_send_commands(commands):
+            self._command_sent = sent
+            if any("intensity" in args for _, args in commands):
+                self._zero_intensity = False
 
         # 更新颜色模式
         if new_color_mode:
             self._color_mode = new_color_mode
 
         self._is_on = True
-        _LOGGER.debug(f"Device {self._name} turned on, new state: brightness={self._brightness}, color_mode={self._color_mode}")
+        _LOGGER.debug("Device %s turned on, new state: brightness=%s, color_mode=%s", self._name, self._brightness, self._color_mode)
         self.async_write_ha_state()
 
+    async def _async_send_commands(self, commands: list) -> bool:
+        """Send the collected commands, merged into one request where possible.
+
+        Returns True if every request got a response.
+        """
+        if len(commands) > 1:
+            # 设备支持时合并为一个set_state请求
+            if self._config.get('set_state_support', False):
+                args = {}
+                for _, command_args in commands:
+                    args.update(command_args)
+                return bool(await self._api.send_request("set_state", node_id=self._node_id, args=args))
+            # 电源打开后其余命令才会生效，先单独发送并等待完成
+            if commands[0][0] == "set_power":
+                action, args = commands[0]
+                if not await self._api.send_request(action, node_id=self._node_id, args=args):
+                    return False
+                commands = commands[1:]
+            # set_hsi和set_rgb已携带强度，无需再单独设置
+            if commands[-1][0] in ("set_hsi", "set_rgb"):
+                commands = [command for command in commands if command[0] != "set_intensity"]
+
+        # 剩余命令相互独立，并发发送
+        responses = await asyncio.gather(
+            *[self._api.send_request(action, node_id=self._node_id, args=args) for action, args in commands]
+        )
+        return all(responses)
+
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the light."""
-        _LOGGER.debug(f"Turning off device {self._name}")
-        await self._api.send_request(
-            "set_intensity", 
-            node_id=self._node_id, 
-            args={"intensity": 0}
-        )
+        _LOGGER.debug("Turning off device %s", self._name)
+        sent = time.monotonic()
+        if self._power_support:
+            # 只关闭电源，设备保留当前亮度，开灯时直接恢复
+            response = await self._api.send_request("set_power", node_id=self._node_id, args={"on": False})
+        else:
+            response = await self._api.send_request(
+                "set_intensity", 
+                node_id=self._node_id, 
+                args={"intensity": 0}
+            )
+        if response:
+            self._command_sent = sent
         self._is_on = False
-        _LOGGER.debug(f"Device {self._name} turned off")
+        _LOGGER.debug("Device %s turned off", self._name)
         self.async_write_ha_state()
 
     async def async_toggle(self, **kwargs) -> None:
         """Toggle the light."""
-        _LOGGER.debug(f"Toggling device {self._name}, current state: {self._is_on}")
+        _LOGGER.debug("Toggling device %s, current state: %s", self._name, self._is_on)
         if self._is_on:
             await self.async_turn_off(**kwargs)
         else:
             await self.async_turn_on(**kwargs)
-        _LOGGER.debug(f"Device {self._name} toggled to new state: {self._is_on}")
-
-    async def async_update(self) -> None:
-        """Update the light state."""
-        _LOGGER.debug(f"Updating state for device {self._name} (node_id: {self._node_id})")
+        _LOGGER.debug("Device %s toggled to new state: %s", self._name, self._is_on)
+
+    async def async_added_to_hass(self) -> None:
+        """Apply the already fetched state when added to hass."""
+        await super().async_added_to_hass()
+        # hass.data[DOMAIN]在条目加载期间不会被替换，绑定一次即可
+        self._domain_data = self.hass.data[DOMAIN]
+        if self.coordinator.data and self._node_id in self.coordinator.data:
+            self._apply_state(self.coordinator.data[self._node_id])
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop polling the node and drop it from the device maps when removed."""
+        self.coordinator.async_remove_node(self._node_id)
+        # 仅移除指向本实体的条目，避免误删重新添加的实体
+        for key, index_id in (('devices', self._device_id), ('devices_by_node', self._node_id)):
+            devices = self._domain_data.get(key)
+            if devices and devices.get(index_id) is self:
+                del devices[index_id]
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        # 忽略在本地命令之前开始的刷新，其结果不反映命令后的状态
+        if (self.coordinator.refresh_started >= self._command_sent
+                and self.coordinator.data and self._node_id in self.coordinator.data):
+            self._apply_state(self.coordinator.data[self._node_id])
+        super()._handle_coordinator_update()
+
+    def _apply_state(self, state: Dict[str, Any]) -> None:
+        """Update the light state from the coordinator data."""
+        _LOGGER.debug("Updating state for device %s (node_id: %s)", self._name, self._node_id)
         # 初始化状态变量
         new_brightness = self._brightness
         new_is_on = self._is_on
@@ -390,39 +444,27 @@ class AmaranLight(LightEntity):
         new_hs_color = None
         new_rgb_color = None
         new_color_mode = None
-        _LOGGER.debug(f"Current state: brightness={self._brightness}, is_on={self._is_on}, color_mode={self._color_mode}")
+        _LOGGER.debug("Current state: brightness=%s, is_on=%s, color_mode=%s", self._brightness, self._is_on, self._color_mode)
 
         # 获取亮度
-        try:
-            intensity_response = await self._api.send_request(
-                "get_intensity", 
-                node_id=self._node_id
-            )
-            if intensity_response and 'data' in intensity_response:
-                intensity = intensity_response['data']
-                # 确保intensity是数字类型
-                if isinstance(intensity, (int, float)):
-                    new_brightness = int(intensity * 255 / 1000)
-                    new_is_on = intensity > 0
-                elif isinstance(intensity, dict):
-                    # 处理可能的字典格式
-                    intensity_value = intensity.get('intensity', 0)
-                    if isinstance(intensity_value, (int, float)):
-                        new_brightness = int(intensity_value * 255 / 1000)
-                        new_is_on = intensity_value > 0
-                    else:
-                        # 尝试获取第一个数值
-                        for value in intensity.values():
-                            if isinstance(value, (int, float)):
-                                new_brightness = int(value * 255 / 1000)
-                                new_is_on = value > 0
-                                break
-                        else:
-                            _LOGGER.warning(f"Unexpected intensity dict format: {intensity} for device {self._name}")
-                else:
-                    _LOGGER.warning(f"Unexpected intensity type: {type(intensity)} for device {self._name}")
-        except Exception as e:
-            _LOGGER.error(f"Failed to update intensity for device {self._name}: {e}")
+        if 'intensity' in state:
+            intensity = _extract(state['intensity'], _INTENSITY_KEYS)
+            if intensity is not None:
+                new_is_on = intensity[0] > 0
+                self._zero_intensity = not new_is_on
+                # 关灯时保留上次的亮度，以便下次开灯恢复
+                if new_is_on:
+                    new_brightness = _I2B[min(1000, max(0, int(intensity[0])))]
+            else:
+                _LOGGER.warning("Unexpected intensity data: %s for device %s", state['intensity'], self._name)
+
+        # 获取电源状态，电源关闭时强度仍可能不为0
+        if 'power' in state:
+            power = _extract(state['power'], _POWER_KEYS)
+            if power is not None:
+                new_is_on = new_is_on and bool(power[0])
+            else:
+                _LOGGER.warning("Unexpected power data: %s for device %s", state['power'], self._name)
 
         # 定义颜色模式优先级: COLOR_TEMP > HS > RGB
         # 先检查当前颜色模式，优先保持
@@ -434,127 +476,46 @@ class AmaranLight(LightEntity):
             new_color_mode = ColorMode.RGB
 
         # 获取色温 (最高优先级)
-        if (ColorMode.COLOR_TEMP in self._color_modes and 
+        if ('cct' in state and 
             (new_color_mode is None or new_color_mode == ColorMode.COLOR_TEMP)):
-            try:
-                cct_response = await self._api.send_request(
-                    "get_cct", 
-                    node_id=self._node_id
-                )
-                if cct_response and 'data' in cct_response:
-                    cct_data = cct_response['data']
-                    # 处理不同的数据格式
-                    if isinstance(cct_data, (int, float)):
-                        new_color_temp = cct_data
-                        new_color_mode = ColorMode.COLOR_TEMP
-                    elif isinstance(cct_data, dict):
-                        # 尝试从字典中获取cct值
-                        if 'cct' in cct_data and isinstance(cct_data['cct'], (int, float)):
-                            new_color_temp = cct_data['cct']
-                            new_color_mode = ColorMode.COLOR_TEMP
-                        else:
-                            # 尝试直接使用字典中的第一个数值
-                            for key, value in cct_data.items():
-                                if isinstance(value, (int, float)):
-                                    new_color_temp = value
-                                    new_color_mode = ColorMode.COLOR_TEMP
-                                    break
-                            else:
-                                _LOGGER.warning(f"Unexpected CCT data format: {cct_data} for device {self._name}")
-                    else:
-                        _LOGGER.warning(f"Unexpected CCT data type: {type(cct_data)} for device {self._name}")
-            except Exception as e:
-                _LOGGER.error(f"Failed to update CCT for device {self._name}: {e}")
+            cct = _extract(state['cct'], _CCT_KEYS)
+            if cct is not None:
+                new_color_temp = cct[0]
+                new_color_mode = ColorMode.COLOR_TEMP
+            else:
+                _LOGGER.warning("Unexpected CCT data: %s for device %s", state['cct'], self._name)
 
         # 获取HS颜色 (次高优先级)
-        if (ColorMode.HS in self._color_modes and 
+        if ('hsi' in state and 
             (new_color_mode is None or new_color_mode == ColorMode.HS)):
-            try:
-                hsi_response = await self._api.send_request(
-                    "get_hsi", 
-                    node_id=self._node_id
-                )
-                if hsi_response and 'data' in hsi_response:
-                    hsi_data = hsi_response['data']
-                    # 处理不同的数据格式
-                    if isinstance(hsi_data, dict):
-                        if 'hue' in hsi_data and 'sat' in hsi_data:
-                            if isinstance(hsi_data['hue'], (int, float)) and isinstance(hsi_data['sat'], (int, float)):
-                                new_hs_color = (hsi_data['hue'], hsi_data['sat'])
-                                new_color_mode = ColorMode.HS
-                        else:
-                            # 尝试从字典中提取hue和sat
-                            hue = None
-                            sat = None
-                            for key, value in hsi_data.items():
-                                if key.lower() == 'hue' and isinstance(value, (int, float)):
-                                    hue = value
-                                elif key.lower() == 'sat' and isinstance(value, (int, float)):
-                                    sat = value
-                                if hue is not None and sat is not None:
-                                    break
-                            if hue is not None and sat is not None:
-                                new_hs_color = (hue, sat)
-                                new_color_mode = ColorMode.HS
-                            else:
-                                _LOGGER.warning(f"Unexpected HSI data format: {hsi_data} for device {self._name}")
-                    elif isinstance(hsi_data, (int, float)):
-                        # 处理可能的单一数值
-                        new_hs_color = (hsi_data, 100)  # 假设饱和度为100
-                        new_color_mode = ColorMode.HS
-                        _LOGGER.warning(f"HSI data is a single value, using default saturation: {hsi_data} for device {self._name}")
-                    else:
-                        _LOGGER.warning(f"Unexpected HSI data type: {type(hsi_data)} for device {self._name}")
-            except Exception as e:
-                _LOGGER.error(f"Failed to update HSI for device {self._name}: {e}")
+            hsi_data = state['hsi']
+            new_hs_color = _extract(hsi_data, _HSI_KEYS)
+            if new_hs_color is None and isinstance(hsi_data, (int, float)):
+                # 处理可能的单一数值
+                new_hs_color = (hsi_data, 100)  # 假设饱和度为100
+                _LOGGER.warning("HSI data is a single value, using default saturation: %s for device %s", hsi_data, self._name)
+            if new_hs_color is not None:
+                new_color_mode = ColorMode.HS
+            else:
+                _LOGGER.warning("Unexpected HSI data: %s for device %s", hsi_data, self._name)
 
         # 获取RGB颜色 (最低优先级)
-        if (ColorMode.RGB in self._color_modes and 
+        if ('rgb' in state and 
             (new_color_mode is None or new_color_mode == ColorMode.RGB)):
-            try:
-                rgb_response = await self._api.send_request(
-                    "get_rgb", 
-                    node_id=self._node_id
-                )
-                if rgb_response and 'data' in rgb_response:
-                    rgb_data = rgb_response['data']
-                    # 处理不同的数据格式
-                    if isinstance(rgb_data, dict):
-                        if 'r' in rgb_data and 'g' in rgb_data and 'b' in rgb_data:
-                            if isinstance(rgb_data['r'], int) and isinstance(rgb_data['g'], int) and isinstance(rgb_data['b'], int):
-                                new_rgb_color = (rgb_data['r'], rgb_data['g'], rgb_data['b'])
-                                new_color_mode = ColorMode.RGB
-                        else:
-                            # 尝试从字典中提取r, g, b
-                            r = None
-                            g = None
-                            b = None
-                            for key, value in rgb_data.items():
-                                if key.lower() == 'r' and isinstance(value, int):
-                                    r = value
-                                elif key.lower() == 'g' and isinstance(value, int):
-                                    g = value
-                                elif key.lower() == 'b' and isinstance(value, int):
-                                    b = value
-                                if r is not None and g is not None and b is not None:
-                                    break
-                            if r is not None and g is not None and b is not None:
-                                new_rgb_color = (r, g, b)
-                                new_color_mode = ColorMode.RGB
-                            else:
-                                _LOGGER.warning(f"Unexpected RGB data format: {rgb_data} for device {self._name}")
-                    elif isinstance(rgb_data, (int, float)):
-                        # 处理可能的单一数值
-                        new_rgb_color = (int(rgb_data), int(rgb_data), int(rgb_data))
-                        new_color_mode = ColorMode.RGB
-                        _LOGGER.warning(f"RGB data is a single value, using grayscale: {rgb_data} for device {self._name}")
-                    else:
-                        _LOGGER.warning(f"Unexpected RGB data type: {type(rgb_data)} for device {self._name}")
-            except Exception as e:
-                _LOGGER.error(f"Failed to update RGB for device {self._name}: {e}")
+            rgb_data = state['rgb']
+            new_rgb_color = _extract(rgb_data, _RGB_KEYS)
+            if new_rgb_color is None and isinstance(rgb_data, (int, float)):
+                # 处理可能的单一数值
+                new_rgb_color = (rgb_data, rgb_data, rgb_data)
+                _LOGGER.warning("RGB data is a single value, using grayscale: %s for device %s", rgb_data, self._name)
+            if new_rgb_color is not None:
+                new_rgb_color = tuple(int(c) for c in new_rgb_color)
+                new_color_mode = ColorMode.RGB
+            else:
+                _LOGGER.warning("Unexpected RGB data: %s for device %s", rgb_data, self._name)
 
         # 更新状态，只保留当前颜色模式的数据
-        _LOGGER.debug(f"Updating to new state: brightness={new_brightness}, is_on={new_is_on}, color_mode={new_color_mode}")
+        _LOGGER.debug("Updating to new state: brightness=%s, is_on=%s, color_mode=%s", new_brightness, new_is_on, new_color_mode)
         self._brightness = new_brightness
         self._is_on = new_is_on
 